@@ -15,9 +15,10 @@ A backup is saved as <file>.bak before overwriting.
 """
 
 import csv
-import re
+import os
 import shutil
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 
 EXPECTED_COLS = 15
@@ -26,24 +27,55 @@ IDX_EXPLANATIONS = 11
 IDX_CARDPLAY = 12
 IDX_CLAIM = 13
 IDX_LIN_URL = 14
+# Read/write buffer size for streaming large lookup files
+IO_BUFFER_SIZE = 1 << 20
 
 # Cardplay is pipe-separated tricks of space-separated cards (e.g. "S4 H3 DA CK|...")
 # Each card is a suit letter + rank char.  Empty string also OK.
-CARDPLAY_RE = re.compile(
-    r'^([SHDC][2-9TJQKA]( [SHDC][2-9TJQKA])*'  # first trick
-    r'(\|[SHDC][2-9TJQKA]( [SHDC][2-9TJQKA])*)*)?$'  # subsequent tricks
-)
+SUITS = frozenset(b'SHDC')
+RANKS = frozenset(b'23456789TJQKA')
+SEPARATORS = frozenset(b' |')
+# Every byte that may appear in a cardplay string; deleting these from a
+# candidate leaves something behind iff it contains an illegal character.
+CARDPLAY_BYTES = bytes(sorted(SUITS | RANKS | SEPARATORS))
+
+# States of the cardplay scanner
+_EXPECT_SUIT, _EXPECT_RANK, _EXPECT_SEP = range(3)
 
 
 def is_cardplay(s: str) -> bool:
     """Return True if s looks like a cardplay string (or is empty)."""
-    return s == '' or bool(CARDPLAY_RE.match(s))
+    if s == '':
+        return True
+    if not s.isascii():
+        return False
+    b = s.encode('ascii')
+    # Cheap C-level reject of free text before walking the bytes
+    if b.translate(None, CARDPLAY_BYTES):
+        return False
+    state = _EXPECT_SUIT
+    for c in b:
+        if state == _EXPECT_SUIT:
+            if c not in SUITS:
+                return False
+            state = _EXPECT_RANK
+        elif state == _EXPECT_RANK:
+            if c not in RANKS:
+                return False
+            state = _EXPECT_SEP
+        else:
+            if c not in SEPARATORS:
+                return False
+            state = _EXPECT_SUIT
+    return state == _EXPECT_SEP
 
 
 def is_claim(s: str) -> bool:
     """Claim is empty or a small integer (0-13)."""
     if s == '':
         return True
+    if s.isascii() and s.isdigit():
+        return int(s) <= 13
     try:
         n = int(s)
         return 0 <= n <= 13
@@ -51,8 +83,24 @@ def is_claim(s: str) -> bool:
         return False
 
 
-def reassemble_row(raw_fields: list[str]) -> list[str]:
-    """Given a raw split with possibly too many fields, return 15 logical fields."""
+def find_cardplay(raw_fields: list[str]) -> int | None:
+    """Return the index of the Cardplay field in an over-split row.
+
+    Scans from index 11 for the first field that looks like cardplay and is
+    followed by a field that looks like Claim.
+    """
+    for i in range(11, len(raw_fields) - 1):
+        if is_cardplay(raw_fields[i]) and is_claim(raw_fields[i + 1]):
+            return i
+    return None
+
+
+def reassemble_row(raw_fields: list[str], line: str) -> list[str]:
+    """Given a raw split with possibly too many fields, return 15 logical fields.
+
+    `line` is the string that was split into `raw_fields`; runs of fields
+    that belong together are sliced straight out of it rather than re-joined.
+    """
     n = len(raw_fields)
 
     if n == EXPECTED_COLS:
@@ -76,72 +124,87 @@ def reassemble_row(raw_fields: list[str]) -> list[str]:
 
     # Find Cardplay: scan from index 11 forward looking for a cardplay match.
     # The first one we find that also has a valid Claim right after it is our match.
-    cardplay_idx = None
-    for i in range(11, n):
-        if is_cardplay(raw_fields[i]):
-            # Check if the next field looks like Claim
-            if i + 1 < n and is_claim(raw_fields[i + 1]):
-                cardplay_idx = i
-                break
+    cardplay_idx = find_cardplay(raw_fields)
+
+    # offsets[i] is where field i starts in `line`, so fields i..j-1 are
+    # line[offsets[i]:offsets[j] - 1] (dropping the trailing comma).
+    offsets = [0]
+    for f in raw_fields:
+        offsets.append(offsets[-1] + len(f) + 1)
 
     if cardplay_idx is None:
         # Fallback: if we can't find it, just rejoin extras into Explanations
         # and hope for the best.  This handles empty-cardplay error rows.
-        explanations = ','.join(raw_fields[11:])
+        explanations = line[offsets[11]:]
         return head + [explanations, '', '', '']
 
-    explanations = ','.join(raw_fields[11:cardplay_idx])
+    explanations = line[offsets[11]:offsets[cardplay_idx] - 1]
     cardplay = raw_fields[cardplay_idx]
     claim = raw_fields[cardplay_idx + 1] if cardplay_idx + 1 < n else ''
-    lin_url = ','.join(raw_fields[cardplay_idx + 2:]) if cardplay_idx + 2 < n else ''
+    lin_url = line[offsets[cardplay_idx + 2]:] if cardplay_idx + 2 < n else ''
 
     return head + [explanations, cardplay, claim, lin_url]
 
 
 def fix_lookup_csv(path: Path) -> None:
-    """Read the broken lookup CSV, fix it, write back with proper quoting."""
-    # Read raw lines (can't use csv.reader reliably on the broken file)
-    text = path.read_text(encoding='utf-8')
-    lines = text.splitlines()
-
-    if not lines:
-        print("Empty file, nothing to do.")
-        return
-
-    header_line = lines[0]
-    header_fields = header_line.split(',')
-
-    if len(header_fields) != EXPECTED_COLS:
-        print(f"Warning: header has {len(header_fields)} fields, expected {EXPECTED_COLS}")
-        print(f"Header: {header_line[:200]}")
-
-    # Backup
-    backup = path.with_suffix(path.suffix + '.bak')
-    shutil.copy2(path, backup)
-    print(f"Backup saved to {backup}")
-
-    rows_fixed = 0
-    rows_total = 0
-    output_rows = []
-
-    # Keep header as-is (it has no commas in field values)
-    output_rows.append(header_fields)
-
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        rows_total += 1
-        raw = line.split(',')
-        if len(raw) != EXPECTED_COLS:
-            rows_fixed += 1
-        logical = reassemble_row(raw)
-        output_rows.append(logical)
-
-    # Write with proper CSV quoting
-    with open(path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        for row in output_rows:
-            writer.writerow(row)
+    """Read the broken lookup CSV, fix it, write back with proper quoting.
+
+    The file is streamed line by line into a temporary sibling which then
+    replaces the original, so memory use does not grow with file size.
+    """
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    try:
+        # Read raw lines (can't use csv.reader reliably on the broken file)
+        with open(path, 'r', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f_in:
+            first = f_in.readline()
+            if not first:
+                print("Empty file, nothing to do.")
+                return
+
+            header_line = first.rstrip('\n')
+            header_fields = header_line.split(',')
+
+            if len(header_fields) != EXPECTED_COLS:
+                print(f"Warning: header has {len(header_fields)} fields, expected {EXPECTED_COLS}")
+                print(f"Header: {header_line[:200]}")
+
+            # Backup
+            backup = path.with_suffix(path.suffix + '.bak')
+            shutil.copy2(path, backup)
+            print(f"Backup saved to {backup}")
+
+            rows_fixed = 0
+            rows_total = 0
+
+            # Write with proper CSV quoting
+            with open(tmp, 'w', newline='', encoding='utf-8',
+                      buffering=IO_BUFFER_SIZE) as f_out:
+                writer = csv.writer(f_out, quoting=csv.QUOTE_MINIMAL)
+
+                # Keep header as-is (it has no commas in field values)
+                writer.writerow(header_fields)
+
+                def fixed_rows() -> Iterator[list[str]]:
+                    nonlocal rows_total, rows_fixed
+                    for line in f_in:
+                        line = line.rstrip('\n')
+                        if not line.strip():
+                            continue
+                        rows_total += 1
+                        raw = line.split(',')
+                        if len(raw) != EXPECTED_COLS:
+                            rows_fixed += 1
+                        yield reassemble_row(raw, line)
+
+                writer.writerows(fixed_rows())
+
+        # Keep the original file's permissions on the replacement
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        # Don't leave a partial rewrite next to the data
+        tmp.unlink(missing_ok=True)
+        raise
 
     print(f"Done! {rows_total} data rows processed, {rows_fixed} rows fixed.")
     print(f"Output written to {path}")
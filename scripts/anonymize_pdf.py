@@ -13,20 +13,28 @@ Usage:
         --extra-redact "R003134,3273 Streamside Cir"
 
 Requires:
-    pip install PyMuPDF Pillow pytesseract
+    pip install PyMuPDF Pillow tesserocr numpy rapidfuzz pyahocorasick
     brew install tesseract
 """
 
 from __future__ import annotations
 
 import argparse
-import io
+import functools
+import hashlib
+import os
 import re
-import shutil
+import string
 import sys
-from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from pathlib import Path
 
+# One single-threaded Tesseract per worker beats one multi-threaded one.
+# OpenMP reads this when the library loads, so it must precede the import.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 try:
     import fitz  # PyMuPDF
 except ImportError:
@@ -38,9 +46,35 @@ except ImportError:
     sys.exit("Pillow is required: pip install Pillow")
 
 try:
-    import pytesseract
+    import tesserocr
+except ImportError:
+    sys.exit("tesserocr is required: pip install tesserocr")
+
+try:
+    import ahocorasick
+except ImportError:
+    sys.exit("pyahocorasick is required: pip install pyahocorasick")
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("NumPy is required: pip install numpy")
+
+try:
+    from rapidfuzz import fuzz
+    from rapidfuzz import process as rf_process
 except ImportError:
-    sys.exit("pytesseract is required: pip install pytesseract")
+    sys.exit("rapidfuzz is required: pip install rapidfuzz")
+
+# A box in image pixel coordinates: (x0, y0, x1, y1)
+Box = tuple[int, int, int, int]
+
+# Images are OCR'd at their native resolution times this factor, however
+# small they are drawn on the page, so Tesseract sees full-height text
+IMAGE_OCR_SCALE = 2.0
+
+# tinyurl.com links in the text layer, redacted as "[link]"
+_URL_RE = re.compile(r'https?://(?:www\.)?tinyurl\.com/\S+')
 
 
 # ---------------------------------------------------------------------------
@@ -50,112 +84,213 @@ except ImportError:
 def parse_name_map(map_str: str) -> dict[str, str]:
     """Parse 'orig1=repl1,orig2=repl2' into {orig: repl} dict.
 
-    Generates case variants automatically.
+    Only one entry is kept per name regardless of case; text search covers
+    the other cases (see _search_variants) and the replacement is re-cased
+    to fit each hit.
     """
     mapping: dict[str, str] = {}
+    seen: set[str] = set()
     for pair in map_str.split(","):
         pair = pair.strip()
         if "=" not in pair:
             continue
         orig, repl = pair.split("=", 1)
         orig, repl = orig.strip(), repl.strip()
-        if not orig:
+        if not orig or orig.casefold() in seen:
             continue
-        # Add the mapping as given plus case variants
-        for o, r in _case_variants(orig, repl):
-            mapping[o] = r
+        seen.add(orig.casefold())
+        mapping[orig] = repl
     return mapping
 
 
-def _case_variants(orig: str, repl: str) -> list[tuple[str, str]]:
-    """Return case variants: as-is, lower, upper, title."""
-    variants = set()
-    variants.add((orig, repl))
-    variants.add((orig.lower(), repl.lower()))
-    variants.add((orig.upper(), repl.upper()))
-    variants.add((orig.title(), repl.title()))
-    return list(variants)
+def _search_variants(orig: str) -> list[str]:
+    """Return the strings to search_for when looking for orig.
+
+    search_for only folds ASCII case, so names with other letters (Müller,
+    José) are also searched in upper, lower, and title case.
+    """
+    if orig.isascii():
+        return [orig]
+    return list(dict.fromkeys([orig, orig.upper(), orig.lower(), orig.title()]))
+
+
+def _match_case(found: str, repl: str) -> str:
+    """Return repl in the same case style (lower/upper/title) as found."""
+    if found.isupper():
+        return repl.upper()
+    if found.islower():
+        return repl.lower()
+    if found.istitle():
+        return repl.title()
+    return repl
 
 
 # ---------------------------------------------------------------------------
 # Text-layer redaction
 # ---------------------------------------------------------------------------
 
-def redact_text_on_page(page: fitz.Page, name_map: dict[str, str],
-                        extra_redact: list[str]) -> int:
-    """Search for names/strings in the text layer and apply redactions.
+def _search_key(text: str) -> str:
+    """Lowercase text and collapse whitespace runs, as search_for matches."""
+    return " ".join(text.split()).lower()
 
-    Returns the number of redactions applied.
+
+def build_name_automaton(name_map: dict[str, str]) -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton over the names in name_map.
+
+    Each key maps to the tuple of originals that normalize to it.
+    """
+    automaton = ahocorasick.Automaton()
+    for orig in name_map:
+        key = _search_key(orig)
+        automaton.add_word(key, automaton.get(key, ()) + (orig,))
+    automaton.make_automaton()
+    return automaton
+
+
+def find_text_redactions(page: fitz.Page, name_map: dict[str, str],
+                         extra_redact: list[str],
+                         automaton: ahocorasick.Automaton | None = None,
+                         ) -> list[tuple[fitz.Rect, str]]:
+    """Search for names/strings in the text layer.
+
+    If `automaton` (from build_name_automaton) is given, the page text is
+    scanned once and only names that occur in it are searched for.
+
+    Returns (rect, replacement) pairs for apply_text_redactions.
     """
-    count = 0
+    redactions: list[tuple[fitz.Rect, str]] = []
+
+    # Extract the page text once; every search and lookup below reuses it
+    tp = page.get_textpage(flags=fitz.TEXTFLAGS_SEARCH)
+
+    names: Iterable[str] = name_map
+    if automaton is not None and len(automaton):
+        text = _search_key(page.get_text(textpage=tp))
+        names = {orig for _, origs in automaton.iter(text) for orig in origs}
 
     # Redact name mappings (replace with alias)
     # Sort by length descending so longer matches are found first
-    for orig in sorted(name_map, key=len, reverse=True):
-        rects = page.search_for(orig)
-        for rect in rects:
-            page.add_redact_annot(
-                rect,
-                text=name_map[orig],
-                fontsize=0,  # auto-fit
-                fill=(1, 1, 1),  # white background
-            )
-            count += 1
+    seen: set[tuple[int, int, int, int]] = set()
+    for orig in sorted(names, key=len, reverse=True):
+        for variant in _search_variants(orig):
+            for rect in page.search_for(variant, textpage=tp):
+                key = (round(rect.x0), round(rect.y0),
+                       round(rect.x1), round(rect.y1))
+                if key in seen:
+                    continue
+                seen.add(key)
+                found = page.get_textbox(rect, textpage=tp).strip()
+                redactions.append((rect, _match_case(found, name_map[orig])))
 
     # Redact extra strings (no replacement text — just white box)
     for text in extra_redact:
         text = text.strip()
         if not text:
             continue
-        rects = page.search_for(text)
-        for rect in rects:
-            page.add_redact_annot(rect, text="", fontsize=0,
-                                  fill=(1, 1, 1))
-            count += 1
+        for rect in page.search_for(text, textpage=tp):
+            redactions.append((rect, ""))
 
     # Redact tinyurl / tinyurl.com links
-    for pattern_text in _find_urls(page):
-        rects = page.search_for(pattern_text)
-        for rect in rects:
-            page.add_redact_annot(rect, text="[link]", fontsize=0,
-                                  fill=(1, 1, 1))
-            count += 1
-
-    if count:
-        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+    for pattern_text in _find_urls(page, tp):
+        for rect in page.search_for(pattern_text, textpage=tp):
+            redactions.append((rect, "[link]"))
 
-    return count
+    return redactions
 
 
-def _find_urls(page: fitz.Page) -> list[str]:
+def apply_text_redactions(page: fitz.Page,
+                          redactions: list[tuple[fitz.Rect, str]]) -> int:
+    """Cover each rect with white and write its replacement text over it.
+
+    Returns the number of redactions applied.
+    """
+    for rect, text in redactions:
+        page.add_redact_annot(
+            rect,
+            text=text,
+            fontsize=0,  # auto-fit
+            fill=(1, 1, 1),  # white background
+        )
+    if redactions:
+        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+    return len(redactions)
+
+
+def _find_urls(page: fitz.Page,
+               textpage: fitz.TextPage | None = None) -> set[str]:
     """Extract tinyurl.com links from page text."""
-    text = page.get_text()
-    urls = re.findall(r'https?://(?:www\.)?tinyurl\.com/\S+', text)
-    return list(set(urls))
+    text = page.get_text(textpage=textpage)
+    return {m.group(0) for m in _URL_RE.finditer(text)}
 
 
 # ---------------------------------------------------------------------------
 # Image-layer redaction via OCR
 # ---------------------------------------------------------------------------
 
-def sample_bg_color(img: Image.Image, x: int, y: int, w: int, h: int,
+def _dominant_color(pixels: np.ndarray) -> tuple[int, ...]:
+    """Return the most common color in an (N, 3) array of RGB pixels.
+
+    The dominant shade is found with np.bincount over colors quantized to
+    5 bits per channel; the exact color returned is the most common one
+    within that bin, so fills still match the background exactly.
+    """
+    rgb = pixels.astype(np.uint32)
+    packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    q = rgb >> 3
+    bins = (q[:, 0] << 10) | (q[:, 1] << 5) | q[:, 2]
+    top = np.bincount(bins).argmax()
+    vals, counts = np.unique(packed[bins == top], return_counts=True)
+    c = int(vals[counts.argmax()])
+    return (c >> 16, (c >> 8) & 0xFF, c & 0xFF)
+
+
+def sample_bg_color(arr: np.ndarray, x: int, y: int, w: int, h: int,
                     margin: int = 4) -> tuple[int, ...]:
-    """Sample the most common color around the bounding box edges."""
-    pixels: list[tuple[int, ...]] = []
-    for dx in range(max(0, x - margin), min(img.width, x + w + margin)):
-        for dy_val in [max(0, y - margin), min(img.height - 1, y + h + margin)]:
-            pixels.append(img.getpixel((dx, dy_val)))
-    for dy in range(max(0, y - margin), min(img.height, y + h + margin)):
-        for dx_val in [max(0, x - margin), min(img.width - 1, x + w + margin)]:
-            pixels.append(img.getpixel((dx_val, dy)))
-    if not pixels:
+    """Sample the most common color in the strips around the bounding box.
+
+    `arr` is the (H, W, 3) RGB array of the image; the four edge strips are
+    taken as slices so no per-pixel Python work is done.
+    """
+    height, width = arr.shape[:2]
+    x0, x1 = max(0, x - margin), min(width, x + w + margin)
+    y0, y1 = max(0, y - margin), min(height, y + h + margin)
+    strips = [
+        arr[y0:max(y0, y), x0:x1],           # top
+        arr[min(y1, y + h):y1, x0:x1],       # bottom
+        arr[y0:y1, x0:max(x0, x)],           # left
+        arr[y0:y1, min(x1, x + w):x1],       # right
+    ]
+    edge = np.concatenate([s.reshape(-1, 3) for s in strips])
+    if not len(edge):
         return (255, 255, 255)
-    counter = Counter(pixels)
-    return counter.most_common(1)[0][0]
+    return _dominant_color(edge)
 
 
-def get_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    """Try to load a sans-serif font at the given size."""
+def sample_bg_color_global(arr: np.ndarray, step: int = 8) -> tuple[int, ...]:
+    """Return the most common color on a sparse grid over the whole image."""
+    return _dominant_color(arr[::step, ::step].reshape(-1, 3))
+
+
+def _ring_points(arr: np.ndarray, x: int, y: int, w: int, h: int,
+                 margin: int = 4) -> np.ndarray | None:
+    """Return the 8 corner and mid-edge pixels `margin` px outside the box.
+
+    Returns None if that ring falls outside the image.
+    """
+    height, width = arr.shape[:2]
+    x0, y0 = x - margin, y - margin
+    x1, y1 = x + w + margin, y + h + margin
+    if x0 < 0 or y0 < 0 or x1 >= width or y1 >= height:
+        return None
+    xm, ym = (x0 + x1) // 2, (y0 + y1) // 2
+    xs = [x0, xm, x1, x0, x1, x0, xm, x1]
+    ys = [y0, y0, y0, ym, ym, y1, y1, y1]
+    return arr[ys, xs]
+
+
+@functools.lru_cache(maxsize=1)
+def _find_font_path() -> str | None:
+    """Return the first available sans-serif TrueType font, if any."""
     font_paths = [
         "/System/Library/Fonts/Helvetica.ttc",
         "/System/Library/Fonts/SFNSText.ttf",
@@ -164,100 +299,116 @@ def get_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     for fp in font_paths:
         if Path(fp).exists():
             try:
-                return ImageFont.truetype(fp, size)
+                ImageFont.truetype(fp, 10)
             except Exception:
                 continue
-    return ImageFont.load_default()
+            return fp
+    return None
 
 
-def _fuzzy_match(ocr_word: str, target: str, threshold: float = 0.75) -> bool:
-    """Check if OCR word is a fuzzy match for target (handles OCR errors).
+@functools.lru_cache(maxsize=64)
+def get_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Try to load a sans-serif font at the given size."""
+    font_path = _find_font_path()
+    if font_path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(font_path, size)
+
 
-    Uses character-level similarity. Threshold of 0.75 means 75% of chars
-    must match.
+def _fuzzy_scores(ocr_words: list[str], targets: list[str],
+                  threshold: float = 75.0) -> np.ndarray:
+    """Return an N x M matrix of OCR word vs target similarity (0 = no match).
+
+    Both lists must already be lowercased.  Similarity is rapidfuzz's
+    normalized Indel ratio (0-100), scored for every pair in one call.
+    Lengths must be within 2 chars, and targets of 3 chars or fewer must
+    match exactly to avoid false positives.
     """
-    if not ocr_word or not target:
-        return False
-    # Exact match
-    if ocr_word.lower() == target.lower():
-        return True
-    # Length must be close (within 2 chars)
-    if abs(len(ocr_word) - len(target)) > 2:
-        return False
-    # For very short words (<=3 chars), require exact match to avoid false positives
-    if len(target) <= 3:
-        return False
-    # Character overlap ratio
-    shorter = min(len(ocr_word), len(target))
-    matches = sum(1 for a, b in zip(ocr_word.lower(), target.lower()) if a == b)
-    return matches / shorter >= threshold
+    # Pages already run in parallel processes, so keep cdist single-threaded
+    scores = rf_process.cdist(ocr_words, targets, scorer=fuzz.ratio,
+                              score_cutoff=threshold, workers=1)
+    word_len = np.array([len(w) for w in ocr_words])[:, None]
+    target_len = np.array([len(t) for t in targets])[None, :]
+    close = (np.abs(word_len - target_len) <= 2) & (target_len > 3)
+    return np.where((scores == 100) | close, scores, 0)
+
+
+# Tesseract engine, created on first use and kept loaded for the life of
+# the process so the model is not re-initialised for every page
+_tess_api: tesserocr.PyTessBaseAPI | None = None
 
 
-def _ocr_image(img: Image.Image, scale: float = 2.0) -> dict:
-    """Run OCR on an image, optionally upscaling for better accuracy."""
+def _get_tess_api() -> tesserocr.PyTessBaseAPI:
+    """Return this process's Tesseract engine, creating it if needed."""
+    global _tess_api
+    if _tess_api is None:
+        _tess_api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SPARSE_TEXT)
+    return _tess_api
+
+
+def _ocr_image(img: Image.Image, scale: float = IMAGE_OCR_SCALE) -> dict:
+    """Run OCR on an image, optionally upscaling for better accuracy.
+
+    Returns word boxes as parallel lists under "text", "conf", "left",
+    "top", "width", and "height", in reading order.
+    """
     if scale != 1.0:
         new_size = (int(img.width * scale), int(img.height * scale))
         scaled = img.resize(new_size, Image.LANCZOS)
     else:
         scaled = img
 
-    # Try multiple PSM modes and merge results
-    configs = [
-        "--psm 6",   # Assume uniform block of text
-        "--psm 11",  # Sparse text - find as much text as possible
-    ]
-    best_data = None
-    best_words = 0
-
-    for config in configs:
-        try:
-            data = pytesseract.image_to_data(
-                scaled, output_type=pytesseract.Output.DICT, config=config
-            )
-            # Count non-empty words with positive confidence
-            word_count = sum(
-                1 for i, w in enumerate(data["text"])
-                if w.strip() and data["conf"][i] > 0
-            )
-            if word_count > best_words:
-                best_words = word_count
-                best_data = data
-        except Exception:
+    data: dict[str, list] = {"text": [], "conf": [], "left": [], "top": [],
+                             "width": [], "height": []}
+
+    # Sparse-text mode finds words anywhere on the page, which suits
+    # screenshots scattered among ordinary text
+    api = _get_tess_api()
+    api.SetImage(scaled)
+    # Recognize() reports failure by returning False, not by raising
+    if not api.Recognize():
+        return data
+    iterator = api.GetIterator()
+    if iterator is None:
+        return data
+
+    level = tesserocr.RIL.WORD
+    for word in tesserocr.iterate_level(iterator, level):
+        text = word.GetUTF8Text(level)
+        box = word.BoundingBox(level)
+        if not text or box is None:
             continue
-
-    if best_data is None:
-        return {"text": [], "conf": [], "left": [], "top": [],
-                "width": [], "height": []}
+        x0, y0, x1, y1 = box
+        data["text"].append(text)
+        data["conf"].append(word.Confidence(level))
+        data["left"].append(x0)
+        data["top"].append(y0)
+        data["width"].append(x1 - x0)
+        data["height"].append(y1 - y0)
 
     # Adjust coordinates back if we scaled
     if scale != 1.0:
         for key in ("left", "top", "width", "height"):
-            best_data[key] = [int(v / scale) for v in best_data[key]]
+            data[key] = [int(v / scale) for v in data[key]]
 
-    return best_data
+    return data
 
 
-def redact_image(img: Image.Image, name_map: dict[str, str],
-                 extra_redact: list[str] | None = None,
-                 ) -> tuple[Image.Image, int]:
-    """Use OCR to find names in an image and redact them.
+def find_redactions(data: dict, name_map: dict[str, str],
+                    extra_redact: list[str] | None = None,
+                    ) -> list[tuple[Box, str]]:
+    """Match OCR words against the name map and extra-redact terms.
 
-    Returns (modified_image, redaction_count).
+    Returns a list of (box, replacement) pairs in the OCR image's pixel
+    coordinates, where box is (x0, y0, x1, y1).  An empty replacement means
+    the box is blanked without drawing any text.
     """
-    if img.mode != "RGB":
-        img = img.convert("RGB")
-
-    try:
-        data = _ocr_image(img)
-    except pytesseract.TesseractNotFoundError:
-        print("ERROR: Tesseract not found. Install with: brew install tesseract",
-              file=sys.stderr)
-        return img, 0
-
-    words = data["text"]
-    n_boxes = len(words)
-    count = 0
-    draw = ImageDraw.Draw(img)
+    # Punctuation OCR attaches to a word ("smith,") would count against it
+    # in the similarity ratio; the word's box is kept as-is
+    words_lc = [w.strip().strip(string.punctuation).lower()
+                for w in data["text"]]
+    n_boxes = len(words_lc)
+    redactions: list[tuple[Box, str]] = []
 
     # Build a lowercase lookup for case-insensitive matching
     lc_map = {k.lower(): v for k, v in name_map.items()}
@@ -265,6 +416,23 @@ def redact_image(img: Image.Image, name_map: dict[str, str],
     # Also build a list of extra-redact terms for images
     extra_lc = [s.lower() for s in (extra_redact or [])]
 
+    # Score every OCR word against every distinct target word at once
+    tokens = list(dict.fromkeys(
+        t for phrase in [*lc_map, *extra_lc] for t in phrase.split()))
+    if not n_boxes or not tokens:
+        return redactions
+    col = {t: c for c, t in enumerate(tokens)}
+    scores = _fuzzy_scores(words_lc, tokens)
+
+    # Columns of the single-word names (in map order) and extra terms.
+    # Word counts come from split(), as for the tokens and the multi-word
+    # passes, so any whitespace (tab, no-break space) separates words.
+    single_names = [(words[0], r) for t, r in lc_map.items()
+                    if len(words := t.split()) == 1]
+    name_cols = np.array([col[w] for w, _ in single_names], dtype=int)
+    extra_cols = np.array([col[words[0]] for t in extra_lc
+                           if len(words := t.split()) == 1], dtype=int)
+
     # First pass: try to match multi-word names by joining consecutive words
     used_indices: set[int] = set()
     sorted_names = sorted(lc_map.keys(), key=len, reverse=True)
@@ -283,8 +451,7 @@ def redact_image(img: Image.Image, name_map: dict[str, str],
                 if idx in used_indices:
                     matched = False
                     break
-                w = words[idx].strip()
-                if not _fuzzy_match(w, nw):
+                if not scores[idx, col[nw]]:
                     matched = False
                     break
                 if data["conf"][idx] < 0:
@@ -293,63 +460,40 @@ def redact_image(img: Image.Image, name_map: dict[str, str],
             if not matched:
                 continue
             # Found multi-word match — redact the span
-            repl = lc_map[name_lc]
             first, last = i, i + len(name_words) - 1
             x = data["left"][first]
             y = min(data["top"][first + k] for k in range(len(name_words)))
             x2 = data["left"][last] + data["width"][last]
             y2 = max(data["top"][first + k] + data["height"][first + k]
                      for k in range(len(name_words)))
-            w_box, h_box = x2 - x, y2 - y
-            bg = sample_bg_color(img, x, y, w_box, h_box)
-            draw.rectangle([x, y, x2, y2], fill=bg)
-            font = get_font(max(10, h_box - 4))
-            brightness = sum(bg[:3]) / 3 if len(bg) >= 3 else 128
-            text_color = (0, 0, 0) if brightness > 128 else (255, 255, 255)
-            draw.text((x + 2, y + 1), repl, fill=text_color, font=font)
+            redactions.append(((x, y, x2, y2), lc_map[name_lc]))
             for k in range(len(name_words)):
                 used_indices.add(i + k)
-            count += 1
 
     # Second pass: single-word matches (with fuzzy matching)
     for i in range(n_boxes):
         if i in used_indices:
             continue
-        w = words[i].strip()
-        if not w or data["conf"][i] < 0:
+        w_lc = words_lc[i]
+        if not w_lc or data["conf"][i] < 0:
             continue
-        w_lc = w.lower()
-        # Check name map
+        # Check name map (multi-word names handled above); the closest
+        # name wins, ties going to the earliest in the map
         matched_repl = None
-        for target, repl in lc_map.items():
-            if " " in target:
-                continue  # multi-word handled above
-            if _fuzzy_match(w_lc, target):
-                matched_repl = repl
-                break
+        row = scores[i, name_cols]
+        if len(row) and row.max() > 0:
+            matched_repl = single_names[row.argmax()][1]
         # Check extra-redact terms
-        is_extra = False
-        if matched_repl is None:
-            for term in extra_lc:
-                if " " not in term and _fuzzy_match(w_lc, term):
-                    matched_repl = ""
-                    is_extra = True
-                    break
+        elif scores[i, extra_cols].any():
+            matched_repl = ""
 
         if matched_repl is None:
             continue
 
         x, y = data["left"][i], data["top"][i]
         bw, bh = data["width"][i], data["height"][i]
-        bg = sample_bg_color(img, x, y, bw, bh)
-        draw.rectangle([x, y, x + bw, y + bh], fill=bg)
-        if matched_repl:
-            font = get_font(max(10, bh - 4))
-            brightness = sum(bg[:3]) / 3 if len(bg) >= 3 else 128
-            text_color = (0, 0, 0) if brightness > 128 else (255, 255, 255)
-            draw.text((x + 2, y + 1), matched_repl, fill=text_color, font=font)
+        redactions.append(((x, y, x + bw, y + bh), matched_repl))
         used_indices.add(i)
-        count += 1
 
     # Third pass: search for multi-word extra-redact terms
     for term in extra_lc:
@@ -365,8 +509,7 @@ def redact_image(img: Image.Image, name_map: dict[str, str],
                 if idx in used_indices:
                     matched = False
                     break
-                w = words[idx].strip()
-                if not _fuzzy_match(w, tw):
+                if not scores[idx, col[tw]]:
                     matched = False
                     break
             if not matched:
@@ -377,61 +520,197 @@ def redact_image(img: Image.Image, name_map: dict[str, str],
             x2 = data["left"][last] + data["width"][last]
             y2 = max(data["top"][first + k] + data["height"][first + k]
                      for k in range(len(term_words)))
-            w_box, h_box = x2 - x, y2 - y
-            bg = sample_bg_color(img, x, y, w_box, h_box)
-            draw.rectangle([x, y, x2, y2], fill=bg)
+            redactions.append(((x, y, x2, y2), ""))
             for k in range(len(term_words)):
                 used_indices.add(i + k)
-            count += 1
 
-    return img, count
+    return redactions
 
 
-def process_page_images(doc: fitz.Document, page: fitz.Page,
-                        name_map: dict[str, str],
-                        extra_redact: list[str] | None = None) -> int:
-    """Extract, OCR, redact, and replace images on a page.
+def redact_image(img: Image.Image,
+                 redactions: list[tuple[Box, str]]) -> Image.Image:
+    """Paint over each box with its background color and draw the replacement.
 
-    Returns number of image redactions applied.
+    Boxes are in the image's own pixel coordinates.
     """
-    images = page.get_images(full=True)
-    if not images:
-        return 0
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    # Snapshot of the original pixels for background sampling
+    arr = np.asarray(img)
+    draw = ImageDraw.Draw(img)
+    # Screenshots usually have one dominant background; only boxes whose
+    # surroundings disagree with it need a full perimeter sample
+    global_bg = sample_bg_color_global(arr)
+
+    for (x, y, x2, y2), repl in redactions:
+        w_box, h_box = x2 - x, y2 - y
+        ring = _ring_points(arr, x, y, w_box, h_box)
+        if ring is not None and (ring == global_bg).all():
+            bg = global_bg
+        else:
+            bg = sample_bg_color(arr, x, y, w_box, h_box)
+        draw.rectangle([x, y, x2, y2], fill=bg)
+        if repl:
+            font = get_font(max(10, h_box - 4))
+            brightness = sum(bg[:3]) / 3 if len(bg) >= 3 else 128
+            text_color = (0, 0, 0) if brightness > 128 else (255, 255, 255)
+            draw.text((x + 2, y + 1), repl, fill=text_color, font=font)
 
-    total = 0
-    for img_info in images:
-        xref = img_info[0]
+    return img
+
+
+def _pixmap_to_image(pix: fitz.Pixmap) -> Image.Image:
+    """Wrap a pixmap's samples as an RGB PIL image without a codec pass."""
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)  # drop alpha
+    if pix.n != 3:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples,
+                           "raw", "RGB", pix.stride)
+
+
+def _image_to_pixmap(img: Image.Image) -> fitz.Pixmap:
+    """Build an RGB pixmap straight from a PIL image's raw bytes.
+
+    The image stream is compressed when the document is saved.
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return fitz.Pixmap(fitz.csRGB, img.width, img.height, img.tobytes(), 0)
+
+
+# OCR results keyed by the image's shape and a digest of its pixels
+_ocr_cache: dict[tuple[int, int, int, bytes], dict] = {}
+
+
+def _ocr_pixmap(pix: fitz.Pixmap) -> dict:
+    """OCR an image pixmap, reusing the result for pixel-identical input."""
+    # The same screenshot is often embedded again under another xref
+    key = (pix.width, pix.height, pix.n,
+           hashlib.sha1(pix.samples_mv).digest())
+    data = _ocr_cache.get(key)
+    if data is None:
+        data = _ocr_image(_pixmap_to_image(pix))
+        _ocr_cache[key] = data
+    return data
+
+
+def find_image_redactions(page: fitz.Page, name_map: dict[str, str],
+                          extra_redact: list[str] | None = None,
+                          ) -> dict[int, list[tuple[Box, str]]]:
+    """OCR each of the page's images and locate names inside them.
+
+    Every image is decoded and OCR'd from its own pixels rather than from
+    the page render: a clip path, soft mask, or anything drawn on top can
+    hide part of an image on the page while its full pixel data, names
+    included, stays in the file.
+
+    Returns {xref: [(box, replacement), ...]} for images that contain a hit,
+    with boxes in that image's own pixel coordinates.
+    """
+    result: dict[int, list[tuple[Box, str]]] = {}
+    for info in page.get_images(full=True):
+        xref, width, height = info[0], info[2], info[3]
+        # Skip very small images (icons, decorations)
+        if width < 100 or height < 100:
+            continue
         try:
-            pix = fitz.Pixmap(doc, xref)
+            pix = fitz.Pixmap(page.parent, xref)
         except Exception:
             continue
+        data = _ocr_pixmap(pix)
+        hits = find_redactions(data, name_map, extra_redact)
+        if hits:
+            result[xref] = hits
+    return result
+
+
+def apply_image_redactions(doc: fitz.Document, page: fitz.Page, xref: int,
+                           redactions: list[tuple[Box, str]],
+                           cache: dict[tuple, fitz.Pixmap] | None = None,
+                           ) -> bool:
+    """Decode image `xref`, redact the given boxes, and replace it in the PDF.
+
+    `page` is any page that displays the image.  If `cache` is given, an
+    image whose dictionary, stream, and boxes match an earlier call reuses
+    that call's result without being decoded again.  Returns False if the image could
+    not be decoded.
+    """
+    key = None
+    if cache is not None:
+        raw = doc.xref_stream_raw(xref)
+        if raw is not None:
+            # The dictionary (size, colorspace, decode, filters) decides
+            # how the raw stream is read
+            key = (doc.xref_object(xref, compressed=True),
+                   hashlib.sha1(raw).digest(), tuple(sorted(redactions)))
+            if key in cache:
+                page.replace_image(xref, pixmap=cache[key])
+                return True
 
-        # Skip very small images (icons, decorations)
-        if pix.width < 100 or pix.height < 100:
-            continue
+    try:
+        pix = fitz.Pixmap(doc, xref)
+    except Exception:
+        return False
 
-        # Convert pixmap to PIL Image
-        if pix.alpha:
-            pix_rgb = fitz.Pixmap(fitz.csRGB, pix)
-        else:
-            pix_rgb = pix if pix.n == 3 else fitz.Pixmap(fitz.csRGB, pix)
+    modified_img = redact_image(_pixmap_to_image(pix), redactions)
+    new_pix = _image_to_pixmap(modified_img)
+    page.replace_image(xref, pixmap=new_pix)
+    if key is not None:
+        cache[key] = new_pix
+    return True
 
-        img = Image.open(io.BytesIO(pix_rgb.tobytes("png")))
 
-        modified_img, count = redact_image(img, name_map, extra_redact)
-        if count == 0:
-            continue
+# ---------------------------------------------------------------------------
+# Per-page worker
+# ---------------------------------------------------------------------------
 
-        total += count
+# State of a worker process, set once by _init_worker
+_worker_doc: fitz.Document | None = None
+_worker_args: tuple[dict[str, str], list[str], bool] = ({}, [], False)
+_worker_automaton: ahocorasick.Automaton | None = None
 
-        # Convert back to bytes and replace in PDF
-        buf = io.BytesIO()
-        modified_img.save(buf, format="PNG")
-        buf.seek(0)
-        new_pix = fitz.Pixmap(buf)
-        page.replace_image(xref, pixmap=new_pix)
 
-    return total
+def _init_worker(shm_name: str, size: int, name_map: dict[str, str],
+                 extra_redact: list[str], do_images: bool) -> None:
+    """Open a private copy of the document in a worker process.
+
+    The PDF bytes are read from the parent's shared memory block `shm_name`
+    rather than being pickled to every worker.
+    """
+    global _worker_doc, _worker_args, _worker_automaton
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        pdf_bytes = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+    _worker_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    _worker_args = (name_map, extra_redact, do_images)
+    _worker_automaton = build_name_automaton(name_map)
+
+
+def process_page(page_num: int) -> tuple[
+        int, list[tuple[tuple[float, ...], str]], dict[int, list[tuple[Box, str]]]]:
+    """Find all text and image redactions for one page.
+
+    Runs in a worker process.  Images are OCR'd from their own pixels and
+    the worker's copy of the document is never modified.  Returns
+    (page_num, text_redactions, image_redactions); nothing is written to
+    the output document here.
+    """
+    name_map, extra_redact, do_images = _worker_args
+    page = _worker_doc[page_num]
+
+    image_redactions: dict[int, list[tuple[Box, str]]] = {}
+    if do_images:
+        image_redactions = find_image_redactions(page, name_map, extra_redact)
+
+    text_redactions = find_text_redactions(page, name_map, extra_redact,
+                                           _worker_automaton)
+
+    return (page_num,
+            [(tuple(rect), text) for rect, text in text_redactions],
+            image_redactions)
 
 
 # ---------------------------------------------------------------------------
@@ -450,6 +729,9 @@ def main() -> None:
                         help="Extra strings to redact (comma-separated)")
     parser.add_argument("--no-images", action="store_true",
                         help="Skip image processing (text-only mode)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="Number of pages to process in parallel "
+                             "(default: CPU count)")
     args = parser.parse_args()
 
     input_path = Path(args.input)
@@ -462,52 +744,78 @@ def main() -> None:
         output_path = input_path.with_stem(input_path.stem + "_anon")
 
     # Check tesseract is available (unless --no-images)
-    if not args.no_images and not shutil.which("tesseract"):
-        sys.exit("Tesseract not found. Install with: brew install tesseract")
+    if not args.no_images and "eng" not in tesserocr.get_languages()[1]:
+        sys.exit("Tesseract (with English data) not found. "
+                 "Install with: brew install tesseract")
 
     name_map = parse_name_map(args.map)
     extra_redact = [s.strip() for s in args.extra_redact.split(",") if s.strip()]
 
     print(f"Input:  {input_path}")
     print(f"Output: {output_path}")
-    print(f"Name mappings ({len(name_map)} variants):")
-    shown = set()
+    print(f"Name mappings ({len(name_map)}):")
     for orig, repl in sorted(name_map.items(), key=lambda x: (-len(x[0]), x[0])):
-        key = (orig.lower(), repl.lower())
-        if key not in shown:
-            print(f"  {orig!r} -> {repl!r}")
-            shown.add(key)
+        print(f"  {orig!r} -> {repl!r}")
     if extra_redact:
         print(f"Extra redact: {extra_redact}")
     print()
 
-    doc = fitz.open(str(input_path))
+    pdf_bytes = input_path.read_bytes()
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    page_count = len(doc)
     total_text = 0
     total_img = 0
 
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        print(f"Page {page_num + 1}/{len(doc)}...", end=" ", flush=True)
-
-        # Text-layer redaction
-        text_count = redact_text_on_page(page, name_map, extra_redact)
-        total_text += text_count
-
-        # Image-layer redaction
-        img_count = 0
-        if not args.no_images:
-            img_count = process_page_images(doc, page, name_map, extra_redact)
-            total_img += img_count
-
-        status = []
-        if text_count:
-            status.append(f"{text_count} text")
-        if img_count:
-            status.append(f"{img_count} image")
-        if status:
-            print(", ".join(status))
-        else:
-            print("(no changes)")
+    # Images can be shared between pages, so boxes are merged per xref and
+    # each image is redacted once after all pages are in.
+    image_redactions: dict[int, tuple[int, list[tuple[Box, str]]]] = {}
+
+    # Workers copy the PDF out of one shared block instead of each being
+    # sent its own pickled copy
+    shm = shared_memory.SharedMemory(create=True, size=len(pdf_bytes))
+    shm.buf[:len(pdf_bytes)] = pdf_bytes
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.jobs,
+            initializer=_init_worker,
+            initargs=(shm.name, len(pdf_bytes), name_map, extra_redact,
+                      not args.no_images),
+        ) as executor:
+            for page_num, text_specs, image_specs in executor.map(
+                    process_page, range(page_count)):
+                print(f"Page {page_num + 1}/{page_count}...", end=" ", flush=True)
+
+                # Text-layer redaction
+                page = doc[page_num]
+                text_count = apply_text_redactions(
+                    page, [(fitz.Rect(r), text) for r, text in text_specs])
+                total_text += text_count
+
+                # Image-layer redaction (applied below)
+                img_count = 0
+                for xref, boxes in image_specs.items():
+                    image_redactions.setdefault(xref, (page_num, []))[1].extend(boxes)
+                    img_count += len(boxes)
+                total_img += img_count
+
+                status = []
+                if text_count:
+                    status.append(f"{text_count} text")
+                if img_count:
+                    status.append(f"{img_count} image")
+                if status:
+                    print(", ".join(status))
+                else:
+                    print("(no changes)")
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Identical images under different xrefs are only redacted once
+    redacted: dict[tuple, fitz.Pixmap] = {}
+    for xref, (page_num, boxes) in image_redactions.items():
+        apply_image_redactions(doc, doc[page_num], xref, boxes, redacted)
 
     doc.save(str(output_path), garbage=4, deflate=True)
     doc.close()